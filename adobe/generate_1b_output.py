@@ -1,6 +1,6 @@
 from pathlib import Path
 from datetime import datetime
-import json
+from json_output import write_json
 
 def main():
     print("=== Enhanced Round 1B: Persona-Driven Document Intelligence (Fixed Input/Output Paths) ===")
@@ -106,8 +106,7 @@ def main():
         ]
     }
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    write_json(output_path, output)
 
     print(f"\n=== Results ===")
     print(f"Results written to: {output_path.resolve()}")
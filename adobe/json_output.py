@@ -0,0 +1,15 @@
+import json
+
+try:
+    import orjson  # Optional: native JSON serializer
+except ImportError:
+    orjson = None
+
+def write_json(path, data):
+    """Write data as indented UTF-8 JSON in a single write, using orjson when available"""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(data, ensure_ascii=False, indent=2))
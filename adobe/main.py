@@ -1,24 +1,49 @@
 import os
 import re
-import json
-import pdfplumber
+import pymupdf
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from itertools import accumulate
 import unicodedata
+from json_output import write_json
+
+try:
+    import re2  # Optional: linear-time DFA matching for the large pattern unions
+except ImportError:
+    re2 = None
 
 INPUT_DIR = "app/input"
 OUTPUT_DIR = "app/output"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+def _char_class(predicate):
+    """Regex character class of every code point matching predicate, as literal ranges"""
+    ranges = []
+    for cp in map(ord, filter(predicate, map(chr, range(0x110000)))):
+        if ranges and ranges[-1][1] == cp - 1:
+            ranges[-1][1] = cp
+        else:
+            ranges.append([cp, cp])
+    return '[' + ''.join(chr(start) if start == end else f'{chr(start)}-{chr(end)}'
+                         for start, end in ranges) + ']'
+
+# Exact equivalents of re's Unicode \d and \s (str.isdecimal / str.isspace),
+# spelled out so they match the same way under RE2, whose \d and \s are
+# ASCII-only. Lines are classified before NFKC, so full-width, Arabic-Indic,
+# Devanagari, no-break and ideographic forms all have to match
+DIGITS = _char_class(str.isdecimal)
+SPACES = _char_class(str.isspace)
+
 # Multilingual noise patterns
 MULTILINGUAL_NOISE_PATTERNS = {
     'universal': [
         r'copyright|©|®|™',
-        r'page \d+|页\s*\d+|ページ\s*\d+|페이지\s*\d+|página\s*\d+|seite\s*\d+',
+        rf'page {DIGITS}+|页{SPACES}*{DIGITS}+|ページ{SPACES}*{DIGITS}+|페이지{SPACES}*{DIGITS}+|página{SPACES}*{DIGITS}+|seite{SPACES}*{DIGITS}+',
         r'version|संस्करण|版本|バージョン|버전|versión|version',
         r'www\.|http|\.com|\.org',
         r'[.\-_]{4,}',  # Dot leaders
-        r'^\d{1,2}:\d{2}|^\d{1,2}/\d{1,2}/\d{2,4}',  # Times/dates
-        r'^[^\w\s]*$',  # Only punctuation
+        rf'^{DIGITS}{{1,2}}:{DIGITS}{{2}}|^{DIGITS}{{1,2}}/{DIGITS}{{1,2}}/{DIGITS}{{2,4}}',  # Times/dates
     ],
     'english': [
         r'all rights reserved|confidential|internal use|draft',
@@ -57,25 +82,25 @@ MULTILINGUAL_NOISE_PATTERNS = {
 # Multilingual heading indicators
 MULTILINGUAL_HEADING_PATTERNS = {
     'numbered_sections': [
-        r'^\d+(\.\d+)*\.?\s+',  # Universal numbering
-        r'^第\d+章|^第\d+节',  # Chinese chapters/sections
-        r'^第\d+章|^第\d+節',  # Traditional Chinese
-        r'^\d+장|^\d+절',      # Korean chapters/sections
-        r'^第\d+章',           # Japanese chapters
-        r'^अध्याय\s*\d+|^खंड\s*\d+',  # Hindi chapters/sections
-        r'^capítulo\s*\d+|^sección\s*\d+',  # Spanish
-        r'^chapitre\s*\d+|^section\s*\d+',  # French
-        r'^kapitel\s*\d+|^abschnitt\s*\d+', # German
+        rf'^{DIGITS}+(\.{DIGITS}+)*\.?{SPACES}+',  # Universal numbering
+        rf'^第{DIGITS}+章|^第{DIGITS}+节',  # Chinese chapters/sections
+        rf'^第{DIGITS}+章|^第{DIGITS}+節',  # Traditional Chinese
+        rf'^{DIGITS}+장|^{DIGITS}+절',      # Korean chapters/sections
+        rf'^第{DIGITS}+章',           # Japanese chapters
+        rf'^अध्याय{SPACES}*{DIGITS}+|^खंड{SPACES}*{DIGITS}+',  # Hindi chapters/sections
+        rf'^capítulo{SPACES}*{DIGITS}+|^sección{SPACES}*{DIGITS}+',  # Spanish
+        rf'^chapitre{SPACES}*{DIGITS}+|^section{SPACES}*{DIGITS}+',  # French
+        rf'^kapitel{SPACES}*{DIGITS}+|^abschnitt{SPACES}*{DIGITS}+', # German
     ],
     'appendix_patterns': [
-        r'^appendix\s+[a-z]',     # English
-        r'^anexo\s+[a-z]',        # Spanish
-        r'^annexe\s+[a-z]',       # French
-        r'^anhang\s+[a-z]',       # German
-        r'^परिशिष्ट\s*[a-z]',      # Hindi
-        r'^附录\s*[a-z]',          # Chinese
-        r'^付録\s*[a-z]',          # Japanese
-        r'^부록\s*[a-z]',          # Korean
+        rf'^appendix{SPACES}+[a-z]',  # English
+        rf'^anexo{SPACES}+[a-z]',     # Spanish
+        rf'^annexe{SPACES}+[a-z]',    # French
+        rf'^anhang{SPACES}+[a-z]',    # German
+        rf'^परिशिष्ट{SPACES}*[a-z]',  # Hindi
+        rf'^附录{SPACES}*[a-z]',        # Chinese
+        rf'^付録{SPACES}*[a-z]',        # Japanese
+        rf'^부록{SPACES}*[a-z]',        # Korean
     ]
 }
 
@@ -91,11 +116,81 @@ INSTRUCTION_WORDS = {
     'german': ['erforderlich', 'bitte', 'ausfüllen', 'vervollständigen', 'eingeben', 'auswählen']
 }
 
-def detect_script_type(text):
-    """Detect the primary script/language family of text"""
-    if not text:
-        return 'latin'
-    
+# Each category is unioned into a single compiled pattern so a line is scanned
+# once per category instead of once per pattern
+def _union(patterns):
+    return '|'.join(f'(?:{pattern})' for pattern in patterns)
+
+def _compile_caseless(pattern):
+    """Compile with RE2 when available, falling back to the re module"""
+    # Inline (?i) is understood by both engines, unlike the re.IGNORECASE flag
+    return (re2 or re).compile('(?i)' + pattern)
+
+_NOISE_RE = _compile_caseless(
+    _union(p for lang_patterns in MULTILINGUAL_NOISE_PATTERNS.values() for p in lang_patterns))
+# Kept on re: RE2's \w and \s are ASCII-only and would flag CJK lines
+_PUNCT_ONLY_RE = re.compile(r'^[^\w\s]*$')
+_NUMBERED_RE = re.compile(_union(MULTILINGUAL_HEADING_PATTERNS['numbered_sections']), re.IGNORECASE)
+_APPENDIX_RE = re.compile(_union(MULTILINGUAL_HEADING_PATTERNS['appendix_patterns']), re.IGNORECASE)
+
+# Heading level prefixes in priority order, matched as one alternation;
+# the name of the group that matched selects the level
+_LEVEL_RULES = [
+    ('numbered_h4', "H4", rf'{DIGITS}+(?:\.{DIGITS}+){{3,}}'),
+    ('numbered_h3', "H3", rf'{DIGITS}+(?:\.{DIGITS}+){{2}}'),
+    ('numbered_h2', "H2", rf'{DIGITS}+\.{DIGITS}+'),
+    ('numbered_h1', "H1", rf'{DIGITS}+\.?{SPACES}'),
+    ('cjk_chapter', "H1", rf'第{DIGITS}+章'),
+    ('cjk_section', "H2", rf'第{DIGITS}+[节節]'),
+    ('korean_chapter', "H1", rf'{DIGITS}+장'),
+    ('korean_section', "H2", rf'{DIGITS}+절'),
+    ('hindi_chapter', "H1", rf'अध्याय{SPACES}*{DIGITS}+'),
+    ('hindi_section', "H2", rf'(?:खंड|भाग){SPACES}*{DIGITS}+'),
+    ('appendix', "H2", _union(MULTILINGUAL_HEADING_PATTERNS['appendix_patterns'])),
+]
+_LEVEL_RE = re.compile(
+    '^(?:' + '|'.join(f'(?P<{name}>{pattern})' for name, _, pattern in _LEVEL_RULES) + ')',
+    re.IGNORECASE)
+_LEVEL_BY_GROUP = {name: level for name, level, _ in _LEVEL_RULES}
+
+_INSTRUCTION_RE = _compile_caseless(
+    '|'.join(re.escape(word) for lang_words in INSTRUCTION_WORDS.values() for word in lang_words))
+
+# Numbering and cleanup patterns
+_PURE_NUMBER_RE = re.compile(rf'^(?:{DIGITS}|{SPACES}|[\-_.()])+$')
+_ADDRESS_RE = re.compile(
+    rf'^{DIGITS}+{SPACES}+(?:[A-Z]|{SPACES})+$|^(?:[A-Z]|{SPACES})+,{SPACES}*[A-Z]{{2}}')
+_TRAILING_LEADER_RE = re.compile(r'[.\-_]{3,}$')
+_TRAILING_PAGE_RE = re.compile(rf'{SPACES}+{DIGITS}+$')
+_MULTI_SPACE_RE = re.compile(rf'{SPACES}{{2,}}')
+
+# Latin-1 byte -> 1 if the character is uppercase, for counting capitals in C
+_UPPER_TABLE = bytes(1 if chr(i).isupper() else 0 for i in range(256))
+
+# Script families in tie-breaking order (first wins on equal counts)
+SCRIPT_TYPES = ('chinese', 'japanese', 'korean', 'devanagari', 'latin', 'cyrillic')
+
+def _build_script_table():
+    """Map every BMP code point to the index of its script, or '-' if it has none"""
+    ranges = [
+        (0x4e00, 0x9fff, 'chinese'),     # CJK Unified Ideographs
+        (0x3040, 0x309f, 'japanese'),    # Hiragana
+        (0x30a0, 0x30ff, 'japanese'),    # Katakana
+        (0xac00, 0xd7af, 'korean'),      # Hangul
+        (0x0900, 0x097f, 'devanagari'),  # Devanagari
+        (0x0400, 0x04ff, 'cyrillic'),    # Cyrillic
+    ]
+    latin = str(SCRIPT_TYPES.index('latin'))
+    table = [latin if chr(cp).isalpha() else '-' for cp in range(0x10000)]
+    for start, end, script in ranges:
+        table[start:end + 1] = str(SCRIPT_TYPES.index(script)) * (end - start + 1)
+    return ''.join(table)
+
+_SCRIPT_TABLE = _build_script_table()
+_SCRIPT_TAGS = tuple(str(i) for i in range(len(SCRIPT_TYPES)))
+
+def _detect_script_type_slow(text):
+    """Per-character fallback for text outside the Basic Multilingual Plane"""
     scripts = {
         'chinese': 0,
         'japanese': 0,
@@ -119,37 +214,63 @@ def detect_script_type(text):
         elif char.isalpha():
             scripts['latin'] += 1
     
+    # Letterless text (numbers, symbols, punctuation) counts as Latin
+    if not any(scripts.values()):
+        return 'latin'
     return max(scripts, key=scripts.get)
 
-def is_multilingual_noise(line, repeated_lines, line_context):
+@lru_cache(maxsize=8192)
+def detect_script_type(text):
+    """Detect the primary script/language family of text"""
+    if not text:
+        return 'latin'
+    
+    # Most lines are plain ASCII, which can only ever count as Latin
+    if text.isascii():
+        return 'latin'
+    
+    if max(text) > '\uffff':
+        return _detect_script_type_slow(text)
+    
+    # One C-level pass maps each character to its script tag
+    tags = text.translate(_SCRIPT_TABLE)
+    counts = [tags.count(tag) for tag in _SCRIPT_TAGS]
+    top = max(counts)
+    # Letterless text (numbers, symbols, punctuation) counts as Latin, as on the ASCII path
+    if not top:
+        return 'latin'
+    return SCRIPT_TYPES[counts.index(top)]
+
+def is_multilingual_noise(line, repeated_lines, short_lines_nearby, line_lower=None):
     """Enhanced multilingual noise detection"""
-    line_lower = line.lower().strip()
+    line = line.strip()
+    # Callers that already case-folded the stripped line can pass it in
+    if line_lower is None:
+        line_lower = line.casefold()
     
     # Skip if repeated across pages (headers/footers)
-    if line.strip() in repeated_lines:
+    if line in repeated_lines:
         return True
     
-    # Basic noise patterns
+    # Basic noise patterns (cheap checks first)
     if not line_lower or len(line_lower) < 2:
         return True
     
-    # Check against all multilingual noise patterns
-    for lang_patterns in MULTILINGUAL_NOISE_PATTERNS.values():
-        for pattern in lang_patterns:
-            if re.search(pattern, line_lower, re.IGNORECASE):
-                return True
+    # Skip pure numbers or symbols
+    if _PURE_NUMBER_RE.match(line):
+        return True
     
     # Skip if part of address/form block
-    if line_context.get('short_lines_nearby', 0) >= 4:
+    if short_lines_nearby >= 4:
         return True
     
-    # Skip pure numbers or symbols
-    if re.match(r'^[\d\s\-_.()]+$', line.strip()):
+    # Check against all multilingual noise patterns
+    if _NOISE_RE.search(line_lower) or _PUNCT_ONLY_RE.match(line_lower):
         return True
     
     return False
 
-def is_multilingual_heading_candidate(line, context, doc_stats):
+def is_multilingual_heading_candidate(line, short_lines_nearby, doc_stats):
     """Enhanced multilingual heading detection"""
     words = line.split()
     line_clean = line.strip()
@@ -168,33 +289,25 @@ def is_multilingual_heading_candidate(line, context, doc_stats):
         return False
     
     # Skip if surrounded by many short lines (forms/addresses)
-    if context.get('short_lines_nearby', 0) >= 4:
+    if short_lines_nearby >= 4:
         return False
     
     # Strong positive signals
     
     # 1. Numbered sections (universal)
-    for pattern in MULTILINGUAL_HEADING_PATTERNS['numbered_sections']:
-        if re.match(pattern, line, re.IGNORECASE):
-            return True
+    if _NUMBERED_RE.match(line):
+        return True
     
     # 2. Appendix patterns (multilingual)
-    for pattern in MULTILINGUAL_HEADING_PATTERNS['appendix_patterns']:
-        if re.match(pattern, line, re.IGNORECASE):
-            return True
+    if _APPENDIX_RE.match(line):
+        return True
     
     # 3. All caps headings (but exclude instructions)
     if line.isupper() and 2 <= len(words) <= 8:
         # Check against instruction words in all languages
-        is_instruction = False
-        for lang_words in INSTRUCTION_WORDS.values():
-            if any(word.lower() in line.lower() for word in lang_words):
-                is_instruction = True
-                break
-        
-        if not is_instruction:
+        if not _INSTRUCTION_RE.search(line):
             # Exclude address patterns (more universal)
-            if not re.match(r'^\d+\s+[A-Z\s]+$|^[A-Z\s]+,\s*[A-Z]{2}', line):
+            if not _ADDRESS_RE.match(line):
                 return True
     
     # 4. Title case headings (mainly for Latin scripts)
@@ -204,7 +317,14 @@ def is_multilingual_heading_candidate(line, context, doc_stats):
     
     # 5. High uppercase ratio (for Latin scripts)
     if script_type == 'latin':
-        uppercase_ratio = sum(c.isupper() for c in line) / max(1, len(line))
+        # Latin-1 lines count capitals with one byte-table pass; lines with
+        # curly quotes, dashes or other wider characters count per character
+        encoded = line.encode('latin-1', 'ignore')
+        if len(encoded) == len(line):
+            upper_count = encoded.translate(_UPPER_TABLE).count(1)
+        else:
+            upper_count = sum(map(str.isupper, line))
+        uppercase_ratio = upper_count / max(1, len(line))
         if 0.6 <= uppercase_ratio < 1.0 and len(words) <= 10:
             return True
     
@@ -235,46 +355,19 @@ def is_multilingual_heading_candidate(line, context, doc_stats):
     
     return False
 
-def get_multilingual_heading_level(text):
+def get_multilingual_heading_level(text, script_type=None):
     """Determine heading level with multilingual support"""
     text = text.strip()
-    script_type = detect_script_type(text)
+    if script_type is None:
+        script_type = detect_script_type(text)
     
-    # Multi-level numbering (universal)
-    if re.match(r'^\d+(\.\d+){3,}', text):
-        return "H4"
-    elif re.match(r'^\d+(\.\d+){2}', text):
-        return "H3"
-    elif re.match(r'^\d+\.\d+', text):
-        return "H2"
-    elif re.match(r'^\d+\.?\s', text):
-        return "H1"
-    
-    # Chinese/Japanese chapter patterns
-    elif re.match(r'^第\d+章', text):
-        return "H1"
-    elif re.match(r'^第\d+节|^第\d+節', text):
-        return "H2"
-    
-    # Korean patterns
-    elif re.match(r'^\d+장', text):
-        return "H1"
-    elif re.match(r'^\d+절', text):
-        return "H2"
-    
-    # Hindi patterns
-    elif re.match(r'^अध्याय\s*\d+', text):
-        return "H1"
-    elif re.match(r'^खंड\s*\d+|^भाग\s*\d+', text):
-        return "H2"
-    
-    # Appendix patterns (multilingual)
-    elif any(re.match(pattern, text, re.IGNORECASE) 
-             for pattern in MULTILINGUAL_HEADING_PATTERNS['appendix_patterns']):
-        return "H2"
+    # Numbered, chapter/section and appendix prefixes (multilingual)
+    match = _LEVEL_RE.match(text)
+    if match:
+        return _LEVEL_BY_GROUP[match.lastgroup]
     
     # Colon-ended headers
-    elif text.endswith(':') and len(text.split()) <= 5:
+    if text.endswith(':') and len(text.split()) <= 5:
         return "H3"
     
     # CJK specific levels
@@ -286,20 +379,27 @@ def get_multilingual_heading_level(text):
     
     return "H1"
 
+@lru_cache(maxsize=4096)
+def normalize_nfkc(text):
+    """NFKC-normalize text, skipping the rewrite when it is already normalized"""
+    if unicodedata.is_normalized('NFKC', text):
+        return text
+    return unicodedata.normalize('NFKC', text)
+
 def clean_multilingual_heading(text):
     """Clean heading text with multilingual support"""
     text = text.strip()
     
     # Remove trailing dots and page numbers (universal)
-    text = re.sub(r'[.\-_]{3,}$', '', text)
-    text = re.sub(r'\s+\d+$', '', text)
-    text = re.sub(r'\s{2,}', ' ', text)
+    text = _TRAILING_LEADER_RE.sub('', text)
+    text = _TRAILING_PAGE_RE.sub('', text)
+    text = _MULTI_SPACE_RE.sub(' ', text)
     
     # Remove common trailing punctuation
     text = re.sub(r'[.。．]{1,2}$', '', text)
     
     # Normalize Unicode (important for multilingual text)
-    text = unicodedata.normalize('NFKC', text)
+    text = normalize_nfkc(text)
     
     return text.strip()
 
@@ -318,36 +418,45 @@ def extract_multilingual_title(first_page_lines, repeated_lines):
         if (min_len < len(line_clean) < max_len and 
             line_clean not in repeated_lines and
             len(line_clean.split()) <= max_words and
-            not is_multilingual_noise(line_clean, repeated_lines, {})):
+            not is_multilingual_noise(line_clean, repeated_lines, 0)):
             return clean_multilingual_heading(line_clean)
     return ""
 
 def extract_outline(pdf_path):
     """Main extraction function with multilingual support"""
-    with pdfplumber.open(pdf_path) as pdf:
-        all_lines = []
+    with pymupdf.open(pdf_path) as doc:
         page_texts = []
+        line_counts = Counter()
+        total_lines = 0
+        total_words = 0
+        leading_lines = []
         
-        # Collect all text
-        for page in pdf.pages:
-            text = page.extract_text() or ""
+        # Collect page text, keeping running statistics instead of a flat copy
+        for page in doc:
+            # Sorted so lines come out top-to-bottom like pdfplumber, not in
+            # content-stream order, and same-baseline spans are joined
+            text = page.get_text("text", sort=True)
             lines = [line.strip() for line in text.split('\n') if line.strip()]
             page_texts.append(lines)
-            all_lines.extend(lines)
+            
+            line_counts.update(lines)
+            total_lines += len(lines)
+            total_words += sum(len(line.split()) for line in lines)
+            if len(leading_lines) < 50:
+                leading_lines.extend(lines[:50 - len(leading_lines)])
         
-        if not all_lines:
+        if not total_lines:
             return {"title": "", "outline": []}
         
         # Calculate document statistics
         doc_stats = {
-            'total_lines': len(all_lines),
-            'avg_line_length': sum(len(line.split()) for line in all_lines) / len(all_lines),
-            'primary_script': detect_script_type(' '.join(all_lines[:50]))  # Detect from first 50 lines
+            'total_lines': total_lines,
+            'avg_line_length': total_words / total_lines,
+            'primary_script': detect_script_type(' '.join(leading_lines))  # Detect from first 50 lines
         }
         
         # Find repeated lines (headers/footers)
-        line_counts = Counter(all_lines)
-        repeated_threshold = max(2, len(pdf.pages) // 3)
+        repeated_threshold = max(2, doc.page_count // 3)
         repeated_lines = {line for line, count in line_counts.items() 
                          if count >= repeated_threshold}
         
@@ -355,45 +464,49 @@ def extract_outline(pdf_path):
         title = extract_multilingual_title(page_texts[0] if page_texts else [], repeated_lines)
         
         # For documents with very few unique lines, likely forms
-        unique_ratio = len(set(all_lines)) / len(all_lines)
-        if unique_ratio < 0.3 and len(all_lines) < 50:
+        unique_ratio = len(line_counts) / total_lines
+        if unique_ratio < 0.3 and total_lines < 50:
             return {"title": title, "outline": []}
         
         # Extract headings
         outline = []
         seen_headings = set()
+        title_key = title.casefold()
         
         for page_idx, lines in enumerate(page_texts):
+            short_prefix = short_line_prefix_sums(lines)
             for line_idx, line in enumerate(lines):
-                if not line.strip():
+                if not line:
                     continue
                 
                 # Analyze context
-                context = analyze_line_context(lines, line_idx)
+                short_lines_nearby = analyze_line_context(short_prefix, line_idx)
                 
-                # Skip noise
-                if is_multilingual_noise(line, repeated_lines, context):
+                # Skip noise (lines are already stripped at extraction)
+                if is_multilingual_noise(line, repeated_lines, short_lines_nearby, line.casefold()):
                     continue
                 
                 # Check if it's a heading candidate
-                if is_multilingual_heading_candidate(line, context, doc_stats):
+                if is_multilingual_heading_candidate(line, short_lines_nearby, doc_stats):
                     clean_text = clean_multilingual_heading(line)
+                    heading_key = clean_text.casefold()
                     
                     # Skip duplicates and title
                     if (clean_text and 
-                        clean_text.lower() != title.lower() and 
-                        clean_text.lower() not in seen_headings):
+                        heading_key != title_key and 
+                        heading_key not in seen_headings):
                         
-                        level = get_multilingual_heading_level(clean_text)
+                        script_type = detect_script_type(clean_text)
+                        level = get_multilingual_heading_level(clean_text, script_type)
                         
                         outline.append({
                             "level": level,
                             "text": clean_text,
                             "page": page_idx,  # Zero-based indexing
-                            "script_type": detect_script_type(clean_text)
+                            "script_type": script_type
                         })
                         
-                        seen_headings.add(clean_text.lower())
+                        seen_headings.add(heading_key)
         
         return {
             "title": title, 
@@ -401,21 +514,20 @@ def extract_outline(pdf_path):
             "document_script": doc_stats['primary_script']
         }
 
-def analyze_line_context(lines, current_idx):
-    """Analyze context around current line (unchanged)"""
-    context = {'short_lines_nearby': 0}
-    
-    # Count short lines in vicinity (±3 lines)
+def short_line_prefix_sums(lines):
+    """Running count of short lines on a page, for analyze_line_context"""
+    return [0, *accumulate(1 if line.strip() and len(line.split()) <= 6 else 0
+                           for line in lines)]
+
+def analyze_line_context(short_prefix, current_idx):
+    """Count short lines around the current line"""
+    # Count short lines in vicinity (±3 lines), excluding the line itself
     start = max(0, current_idx - 3)
-    end = min(len(lines), current_idx + 4)
-    
-    for i in range(start, end):
-        if i != current_idx and lines[i].strip():
-            words = lines[i].split()
-            if len(words) <= 6:
-                context['short_lines_nearby'] += 1
+    end = min(len(short_prefix) - 1, current_idx + 4)
+    short_lines_nearby = short_prefix[end] - short_prefix[start]
+    short_lines_nearby -= short_prefix[current_idx + 1] - short_prefix[current_idx]
     
-    return context
+    return short_lines_nearby
 
 # Process all PDFs
 if __name__ == "__main__":
@@ -423,16 +535,29 @@ if __name__ == "__main__":
     print("Supports: English, Hindi, Chinese, Japanese, Korean, Spanish, French, German")
     print("-" * 70)
     
+    # PDFs are processed in parallel; override the worker count with PDF_WORKERS
+    try:
+        max_workers = int(os.environ.get("PDF_WORKERS", 0)) or os.cpu_count() or 1
+    except ValueError:
+        print(f"⚠️ Ignoring invalid PDF_WORKERS={os.environ['PDF_WORKERS']!r}")
+        max_workers = os.cpu_count() or 1
+    
     processed_count = 0
-    for filename in os.listdir(INPUT_DIR):
-        if filename.lower().endswith('.pdf'):
-            pdf_path = os.path.join(INPUT_DIR, filename)
+    with os.scandir(INPUT_DIR) as entries:
+        pdf_entries = [entry for entry in entries
+                       if entry.name.lower().endswith('.pdf') and entry.is_file()]
+    
+    with ProcessPoolExecutor(max_workers=max(1, min(max_workers, len(pdf_entries)))) as pool:
+        futures = {pool.submit(extract_outline, entry.path): entry.name
+                   for entry in pdf_entries}
+        
+        for future in as_completed(futures):
+            filename = futures[future]
             try:
-                result = extract_outline(pdf_path)
-                output_path = os.path.join(OUTPUT_DIR, filename.replace('.pdf', '.json'))
+                result = future.result()
+                output_path = os.path.join(OUTPUT_DIR, os.path.splitext(filename)[0] + '.json')
                 
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    json.dump(result, f, ensure_ascii=False, indent=2)
+                write_json(output_path, result)
                 
                 script_info = f"({result.get('document_script', 'unknown')} script)"
                 outline_count = len(result.get('outline', []))